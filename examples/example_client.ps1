@@ -47,7 +47,7 @@ function Set-LEDColor {
         $uri = "$Url/update?r=$Red&g=$Green&b=$Blue"
         $response = Invoke-WebRequest -Uri $uri -Method Get -TimeoutSec 5 -UseBasicParsing
         
-        if ($response.StatusCode -eq 200) {
+        if ($response.StatusCode -eq 200 -or $response.StatusCode -eq 204) {
             Write-Host "✓ Set LEDs to RGB($Red, $Green, $Blue)" -ForegroundColor Green
             return $true
         } else {
@@ -5,12 +5,11 @@ Example API client for WS2812B LED Controller
 Demonstrates how to control the LEDs programmatically via HTTP requests.
 Run this on any device that can reach the LED controller's IP address.
 
-Uses only native Python libraries (urllib) - no external dependencies!
+Uses only native Python libraries (http.client) - no external dependencies!
 """
 
-import urllib.request
+import http.client
 import urllib.parse
-import urllib.error
 import json
 import time
 import sys
@@ -18,21 +17,44 @@ import sys
 # Configuration - update with your LED controller's address
 LED_CONTROLLER_URL = "http://localhost:8080"
 
+# A single keep-alive connection is reused for every request, so animations
+# don't pay a TCP connect per frame
+_url = urllib.parse.urlsplit(LED_CONTROLLER_URL)
+_conn = http.client.HTTPConnection(_url.hostname, _url.port or 80, timeout=5)
+
+
+def _get(path):
+    """Send a GET request over the shared connection and return (status, body)."""
+    try:
+        try:
+            _conn.request("GET", path)
+            response = _conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionError):
+            # The server dropped the idle connection - reconnect and retry once
+            _conn.close()
+            _conn.request("GET", path)
+            response = _conn.getresponse()
+        return response.status, response.read()
+    except (http.client.HTTPException, OSError):
+        # Don't leave the connection mid-request (e.g. after a timeout), or
+        # every later call would fail; the next request reconnects cleanly
+        _conn.close()
+        raise
+
 
 def set_color(r, g, b):
     """Set all LEDs to a specific RGB color."""
     try:
-        params = urllib.parse.urlencode({"r": r, "g": g, "b": b})
-        url = f"{LED_CONTROLLER_URL}/update?{params}"
+        # Plain integers need no URL escaping
+        status, _ = _get(f"/update?r={r}&g={g}&b={b}")
         
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                print(f"✓ Set LEDs to RGB({r}, {g}, {b})")
-                return True
-            else:
-                print(f"✗ Error: {response.status}")
-                return False
-    except urllib.error.URLError as e:
+        if status in (200, 204):
+            print(f"✓ Set LEDs to RGB({r}, {g}, {b})")
+            return True
+        else:
+            print(f"✗ Error: {status}")
+            return False
+    except (http.client.HTTPException, OSError) as e:
         print(f"✗ Connection error: {e}")
         return False
     except Exception as e:
@@ -43,16 +65,14 @@ def set_color(r, g, b):
 def get_health():
     """Get health status and system information."""
     try:
-        url = f"{LED_CONTROLLER_URL}/health"
+        status, data = _get("/health")
         
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                data = response.read().decode('utf-8')
-                return json.loads(data)
-            else:
-                print(f"✗ Error: {response.status}")
-                return None
-    except urllib.error.URLError as e:
+        if status == 200:
+            return json.loads(data.decode('utf-8'))
+        else:
+            print(f"✗ Error: {status}")
+            return None
+    except (http.client.HTTPException, OSError) as e:
         print(f"✗ Connection error: {e}")
         return None
     except Exception as e:
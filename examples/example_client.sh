@@ -35,7 +35,7 @@ set_color() {
     response=$(curl -s -w "\n%{http_code}" "${LED_CONTROLLER}/update?r=${r}&g=${g}&b=${b}")
     http_code=$(echo "$response" | tail -n1)
     
-    if [ "$http_code" -eq 200 ]; then
+    if [ "$http_code" -eq 200 ] || [ "$http_code" -eq 204 ]; then
         echo "✓ Success"
     else
         echo "✗ Error: HTTP $http_code"
@@ -4,19 +4,18 @@ Provides an HTTP web server for controlling RGB LED strips
 
 API Endpoints:
     GET /             - Web control interface
-    GET /update       - Update all LED colors (query params: r, g, b [0-255])
-    GET /update_led   - Update individual LED (query params: index, r, g, b)
+    GET /update       - Update all LED colors (query params: r, g, b [0-255] or c [RRGGBB])
+    GET /update_led   - Update individual LED (query params: index, r, g, b or c)
     GET /health       - Health check and system status
     GET /api/docs     - API documentation
 
 Example API calls:
     /update?r=255&g=0&b=0           # Set all LEDs to red
+    /update?c=ff0000                 # Same, as one hex color
     /update_led?index=0&r=255&g=0&b=0  # Set first LED to red
     /health                          # Get system status
 """
 import http.server
-import socketserver
-import urllib.parse
 import threading
 import spidev
 import time
@@ -25,20 +24,42 @@ import sys
 import atexit
 import platform
 import os
+import math
+import collections
+import string
+import functools
+import hashlib
+import re
+import gzip
 
 # Configuration Constants
 PORT = 8080  # HTTP server port (may require root/admin on Linux)
 NUM_LEDS = 16  # Number of LEDs in the strip
 DEFAULT_BRIGHTNESS = 64  # Default brightness (0-255)
 RING_SPEED = 0.03  # Delay between LEDs in startup animation (seconds)
+SPI_SPEED_HZ = 2400000  # 2.4 MHz SPI clock for WS2812B timing
+COLOR_ORDER = "GRB"  # Channel order the LEDs expect (WS2812B uses GRB)
+HEALTH_CACHE_TTL = 3.0  # How long a /health response is reused (seconds)
 
 # Global state for current LED color (accessed by multiple threads)
-led_state = {'r': DEFAULT_BRIGHTNESS, 'g': DEFAULT_BRIGHTNESS, 'b': DEFAULT_BRIGHTNESS}
-# State for individual LEDs - list of (r, g, b) tuples
-individual_led_state = [(DEFAULT_BRIGHTNESS, DEFAULT_BRIGHTNESS, DEFAULT_BRIGHTNESS)] * NUM_LEDS
-lock = threading.Lock()  # Protects SPI communication and led_state from concurrent access
+# An immutable (r, g, b) tuple that is only ever replaced as a whole, so readers
+# never need a lock; it is only written under pending_cond (queue_led_update)
+led_state = (DEFAULT_BRIGHTNESS, DEFAULT_BRIGHTNESS, DEFAULT_BRIGHTNESS)
+# State for individual LEDs - flat bytearray of 3 bytes per LED in COLOR_ORDER
+# (wire order), so it can be encoded directly without per-LED tuple handling
+individual_led_state = bytearray([DEFAULT_BRIGHTNESS] * 3 * NUM_LEDS)
+spi_lock = threading.Lock()  # Serializes SPI transfers
 server_start_time = time.time()  # Track server uptime
 update_count = 0  # Track number of LED updates
+# Latest LED state handed from HTTP handlers to the LED writer thread:
+# 'dirty' means individual_led_state changed, 'rgb' is set while it is one solid color,
+# 'count' is how many LEDs (from the start of the strip) need to be resent and
+# 'solid' is the color the whole strip was last set to (None after per-LED changes)
+pending = {'rgb': None, 'dirty': False, 'count': 0, 'solid': None}
+pending_cond = threading.Condition()  # Also guards individual_led_state and led_state writes
+# Cached /health response body, separate lock so polling never waits on SPI
+_health_cache = {'expires': 0.0, 'update_count': -1, 'body': b''}
+health_lock = threading.Lock()
 
 # === SPI Setup with Error Handling ===
 # WS2812B LEDs use a specific timing protocol that can be approximated via SPI
@@ -46,13 +67,36 @@ spi = None
 try:
     spi = spidev.SpiDev()
     spi.open(0, 0)  # Open SPI bus 0, device 0
-    spi.max_speed_hz = 2400000  # 2.4 MHz SPI clock for WS2812B timing
+    spi.max_speed_hz = SPI_SPEED_HZ
     print("✓ SPI initialized successfully")
 except Exception as e:
     print(f"✗ Failed to initialize SPI: {e}")
     print("  Make sure SPI is enabled and you have the necessary permissions.")
     sys.exit(1)
 
+# === Background Logging ===
+# Runtime messages go into a bounded ring buffer that a daemon thread drains
+# to stderr, so request and SPI paths never block on console I/O
+LOG_Q = collections.deque(maxlen=1024)
+LOG_EVT = threading.Event()
+
+def log(msg):
+    """Queue a message for the background log writer."""
+    LOG_Q.append((time.time(), msg))
+    LOG_EVT.set()
+
+def log_writer_loop():
+    """Drain queued log messages to stderr; runs forever in a daemon thread."""
+    while True:
+        LOG_EVT.wait()
+        LOG_EVT.clear()
+        lines = []
+        while LOG_Q:
+            ts, msg = LOG_Q.popleft()
+            lines.append(f"[{time.strftime('%d/%b/%Y %H:%M:%S', time.localtime(ts))}] {msg}\n")
+        sys.stderr.write(''.join(lines))
+        sys.stderr.flush()
+
 # Register cleanup function to ensure SPI is closed properly
 def cleanup_spi():
     """Clean up SPI connection on program exit."""
@@ -65,7 +109,26 @@ def cleanup_spi():
 
 atexit.register(cleanup_spi)
 
+def spi_writer(dev):
+    """
+    Pick the cheapest way to send data to an SPI device.
+    
+    WS2812B data is write-only, so prefer writebytes2, which takes bytes-like
+    buffers directly and skips the read-back. Older spidev versions only have
+    writebytes, which is still write-only but needs a list of ints.
+    """
+    if hasattr(dev, 'writebytes2'):
+        return dev.writebytes2
+    return lambda data: dev.writebytes(list(data))
+
+spi_write = spi_writer(spi)
+
 # === System Stats Helpers (native Python only) ===
+MEMTOTAL_RE = re.compile(rb'MemTotal:\s+(\d+)')
+MEMAVAILABLE_RE = re.compile(rb'MemAvailable:\s+(\d+)')
+# Last memory reading; /health polls during LED updates would otherwise re-read it
+_memory_cache = {'expires': 0.0, 'info': None}
+
 def get_cpu_count():
     """Get number of CPU cores."""
     try:
@@ -74,28 +137,32 @@ def get_cpu_count():
         return "unknown"
 
 def get_memory_info():
-    """Get basic memory info from /proc/meminfo (Linux only)."""
+    """Get basic memory info from /proc/meminfo (Linux only), cached for 1s."""
+    now = time.monotonic()
+    if now < _memory_cache['expires']:
+        return _memory_cache['info']
+    
+    info = {"note": "Memory info not available"}
     try:
-        with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-            mem_info = {}
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    mem_info[key.strip()] = value.strip()
-            
-            total = int(mem_info.get('MemTotal', '0').split()[0])
-            available = int(mem_info.get('MemAvailable', '0').split()[0])
-            if total > 0:
-                used_percent = round((total - available) / total * 100, 1)
-                return {
-                    "total_mb": round(total / 1024, 1),
-                    "available_mb": round(available / 1024, 1),
-                    "used_percent": used_percent
-                }
+        # Both fields are near the top of the file, so the first 2KB is enough
+        with open('/proc/meminfo', 'rb') as f:
+            data = f.read(2048)
+        
+        total_match = MEMTOTAL_RE.search(data)
+        available_match = MEMAVAILABLE_RE.search(data)
+        total = int(total_match.group(1)) if total_match else 0
+        available = int(available_match.group(1)) if available_match else 0
+        if total > 0:
+            used_percent = round((total - available) / total * 100, 1)
+            info = {
+                "total_mb": round(total / 1024, 1),
+                "available_mb": round(available / 1024, 1),
+                "used_percent": used_percent
+            }
     except:
         pass
-    return {"note": "Memory info not available"}
+    _memory_cache.update({'expires': now + 1.0, 'info': info})
+    return info
 
 def get_uptime():
     """Get system uptime (Linux only)."""
@@ -132,52 +199,95 @@ def get_cpu_temp():
 BIT_0 = 0b100
 BIT_1 = 0b110
 
-# Pre-compute lookup table for all possible byte values
-# This improves performance by avoiding repeated bit manipulation
-LOOKUP = {}
-for byte in range(256):
-    bits = []
-    for i in range(8):
-        bit = (byte >> (7 - i)) & 0x01
-        bits.append(BIT_1 if bit else BIT_0)
-    LOOKUP[byte] = bits
+# Pre-compute the SPI encoding for all possible byte values
+# Each color byte expands to 8 x 3 = 24 SPI bits, which is exactly 3 bytes,
+# so encoding a frame is a table lookup per byte with no bit packing
+NIBBLE_TO_SPI = [0] * 16  # Each 4-bit half expands to 12 SPI bits
+for nibble in range(16):
+    for i in range(4):
+        NIBBLE_TO_SPI[nibble] = (NIBBLE_TO_SPI[nibble] << 3) | (BIT_1 if nibble & (0x08 >> i) else BIT_0)
+BYTE_TO_SPI = [((NIBBLE_TO_SPI[byte >> 4] << 12) | NIBBLE_TO_SPI[byte & 0x0F]).to_bytes(3, 'big')
+               for byte in range(256)]
+
+# Split the table by output position so a whole frame can be encoded with
+# bytes.translate(), which runs the per-byte lookup in C
+SPI_TABLES = tuple(bytes(BYTE_TO_SPI[byte][i] for byte in range(256)) for i in range(3))
+
+# Position of each wire-order channel within an (r, g, b) tuple, e.g. (1, 0, 2) for GRB
+CHANNEL_INDEX = tuple("RGB".index(channel) for channel in COLOR_ORDER)
+
+def to_wire_order(r, g, b):
+    """Return one LED's color as 3 bytes in COLOR_ORDER."""
+    rgb = (r, g, b)
+    return bytes([rgb[i] for i in CHANNEL_INDEX])
+
+def clamp8(x):
+    """Clamp an integer to the 0-255 range of a color channel."""
+    return 0 if x < 0 else 255 if x > 255 else x
 
-def encode_led_data(rgb_data):
+def encode_grb(grb, out):
     """
-    Encode RGB data for WS2812B LEDs into SPI-compatible byte stream.
+    Encode a flat wire-order (GRB) byte buffer into SPI-compatible byte stream.
     
-    WS2812B expects data in GRB order (not RGB).
-    Each color byte is expanded into 3-bit patterns and packed into bytes for SPI transmission.
+    Each of the 3 SPI bytes per color byte is produced for the whole buffer
+    in one translate() pass and interleaved via extended slice assignment.
+    
+    Args:
+        grb: bytes-like of length 3 * num_leds, channels in COLOR_ORDER
+        out: Writable buffer of length 9 * num_leds to encode into in place
+             (e.g. a memoryview into a transmit buffer)
+        
+    Returns:
+        out, now holding the bytes to send via SPI
+    """
+    for i, table in enumerate(SPI_TABLES):
+        out[i::3] = grb.translate(table)
+    return out
+
+# Leading zeros are required for WS2812B reset timing
+RESET = bytes(3)
+# Trailing zeros hold the line low for the >50us WS2812B latch, so no sleep is
+# needed after a transfer (15 bytes at 2.4 MHz)
+LATCH = bytes(math.ceil(50e-6 * SPI_SPEED_HZ / 8))
+
+# Reusable SPI transmit buffer (guarded by spi_lock); the RESET and LATCH zeros
+# stay in place and only the LED data between them is overwritten per update
+tx_buf = bytearray(len(RESET) + 9 * NUM_LEDS + len(LATCH))
+TX_LED_DATA = slice(len(RESET), len(RESET) + 9 * NUM_LEDS)
+tx_view = memoryview(tx_buf)
+tx_led_view = tx_view[TX_LED_DATA]  # Encoders write here in place
+
+def encode_one_led(r, g, b):
+    """
+    Encode a single LED color into its SPI byte pattern.
     
     Args:
-        rgb_data: List of (r, g, b) tuples, one per LED
+        r: Red value (0-255)
+        g: Green value (0-255)
+        b: Blue value (0-255)
         
     Returns:
-        List of bytes ready to send via SPI
+        bytes: 9 SPI bytes (24 color bits x 3 SPI bits) for one LED
     """
-    encoded = []
-    # WS2812B uses GRB order, not RGB
-    for (r, g, b) in rgb_data:
-        for byte in (g, r, b):  # Note: GRB order
-            encoded.extend(LOOKUP[byte])
+    return b''.join([BYTE_TO_SPI[byte] for byte in to_wire_order(r, g, b)])
 
-    # Pack the 3-bit patterns into bytes for SPI transmission
-    packed = []
-    current_byte = 0
-    bit_count = 0
-    for triplet in encoded:
-        for i in range(3):
-            bit = (triplet >> (2 - i)) & 0x1
-            current_byte = (current_byte << 1) | bit
-            bit_count += 1
-            if bit_count == 8:
-                packed.append(current_byte)
-                current_byte = 0
-                bit_count = 0
-    # Handle any remaining bits
-    if bit_count > 0:
-        packed.append(current_byte << (8 - bit_count))
-    return packed
+@functools.lru_cache(maxsize=1024)
+def solid_frame(r, g, b):
+    """
+    Build the complete SPI frame that sets every LED to one color.
+    
+    Cached per color, so repeated colors (e.g. slider drags or a client
+    cycling through a fixed palette) are sent without any encoding work.
+    
+    Args:
+        r: Red value (0-255)
+        g: Green value (0-255)
+        b: Blue value (0-255)
+        
+    Returns:
+        bytes: RESET + LED data for all NUM_LEDS LEDs + LATCH
+    """
+    return RESET + encode_one_led(r, g, b) * NUM_LEDS + LATCH
 
 def run_ring_animation(spi, num_leds, brightness=64, delay=0.05):
     """
@@ -189,23 +299,20 @@ def run_ring_animation(spi, num_leds, brightness=64, delay=0.05):
         brightness: Brightness level (0-255)
         delay: Delay between each LED step in seconds
     """
-    for i in range(num_leds):
-        # Start with all LEDs off
-        rgb_list = [(0, 0, 0)] * num_leds
-
-        # Light up one pixel at a time (white)
-        rgb_list[i] = (brightness, brightness, brightness)
-
-        # Encode and send data
-        # Leading zeros are required for WS2812B reset timing
-        spi_data = [0x00, 0x00, 0x00] + encode_led_data(rgb_list)
-        spi.xfer2(spi_data)
+    write = spi_writer(spi)
+    # Every step is one lit (white) LED among dark ones, so all frames are
+    # built up front and the loop only sends and sleeps
+    lit = encode_one_led(brightness, brightness, brightness)
+    dark = encode_one_led(0, 0, 0)
+    frames = [RESET + dark * i + lit + dark * (num_leds - i - 1) for i in range(num_leds)]
+    for frame in frames:
+        write(frame)
         time.sleep(delay)
 
 def update_leds(r, g, b):
     """
-    Update all LEDs to the specified RGB color.
-    Thread-safe via lock to prevent concurrent SPI access.
+    Send a solid RGB color to all LEDs.
+    Thread-safe via spi_lock to prevent concurrent SPI access.
     
     Args:
         r: Red value (0-255)
@@ -215,27 +322,90 @@ def update_leds(r, g, b):
     Returns:
         bool: True if successful, False if failed
     """
-    global update_count, individual_led_state
+    global update_count
+    
+    # Set all LEDs to the same color
+    frame = solid_frame(r, g, b)
+    
+    with spi_lock:
+        try:
+            spi_write(frame)
+            update_count += 1
+            return True
+        except Exception as e:
+            log(f"Error updating LEDs: {e}")
+            return False
+
+def update_strip(grb):
+    """
+    Send per-LED colors to the start of the strip.
+    Thread-safe via spi_lock to prevent concurrent SPI access.
+    
+    Only the LEDs given are sent; LEDs past the end of grb receive no data
+    and keep showing their current color.
+    
+    Args:
+        grb: Flat bytes of 3 channel values (in COLOR_ORDER) per LED, for
+             up to NUM_LEDS LEDs
+        
+    Returns:
+        bool: True if successful, False if failed
+    """
+    global update_count
     
-    with lock:
+    with spi_lock:
         try:
-            # Set all LEDs to the same color
-            rgb_list = [(r, g, b)] * NUM_LEDS
-            spi_data = [0x00, 0x00, 0x00] + encode_led_data(rgb_list)
-            spi.xfer2(spi_data)
-            time.sleep(0.001)  # Small delay for LED latch
+            end = len(RESET) + 3 * len(grb)
+            encode_grb(grb, tx_led_view[:3 * len(grb)])
+            tx_buf[end:end + len(LATCH)] = LATCH
+            spi_write(tx_view[:end + len(LATCH)])
             update_count += 1
-            # Update individual LED state tracking
-            individual_led_state = rgb_list.copy()
             return True
         except Exception as e:
-            print(f"Error updating LEDs: {e}")
+            log(f"Error updating LED strip: {e}")
             return False
 
+def queue_led_update(r=None, g=None, b=None):
+    """
+    Set all LEDs to a color via the LED writer thread and return immediately.
+    
+    The new color is stored in led_state and queued under one lock, so
+    concurrent requests can't leave led_state out of step with the strip.
+    Only the most recent state is sent, so bursts of requests (e.g. slider
+    drags) are coalesced and intermediate colors are dropped. Repeats of the
+    color the strip is already set to are ignored.
+    
+    Args:
+        r: Red value (clamped to 0-255), or None to keep the current value
+        g: Green value (clamped to 0-255), or None to keep the current value
+        b: Blue value (clamped to 0-255), or None to keep the current value
+        
+    Returns:
+        tuple: The (r, g, b) color the strip is set to
+    """
+    global led_state
+    
+    with pending_cond:
+        current = led_state
+        rgb = tuple(current[i] if value is None else clamp8(value)
+                    for i, value in enumerate((r, g, b)))
+        led_state = rgb
+        if pending['solid'] == rgb:
+            return rgb
+        pending['solid'] = rgb
+        individual_led_state[:] = to_wire_order(*rgb) * NUM_LEDS
+        pending['rgb'] = rgb
+        pending['dirty'] = True
+        pending['count'] = NUM_LEDS
+        pending_cond.notify()
+    return rgb
+
 def update_individual_led(index, r, g, b):
     """
-    Update a single LED to the specified RGB color.
-    Thread-safe via lock to prevent concurrent SPI access.
+    Set a single LED to a color via the LED writer thread.
+    
+    The LED state is updated immediately (so it is ordered correctly with
+    /update requests); the SPI transfer happens on the writer thread.
     
     Args:
         index: LED index (0 to NUM_LEDS-1)
@@ -244,832 +414,1026 @@ def update_individual_led(index, r, g, b):
         b: Blue value (0-255)
         
     Returns:
-        bool: True if successful, False if failed
+        bool: True if queued, False if the index is invalid
     """
-    global update_count, individual_led_state
-    
     if index < 0 or index >= NUM_LEDS:
         return False
     
-    with lock:
-        try:
-            # Update the specific LED in our state
-            individual_led_state[index] = (r, g, b)
-            # Send entire strip state
-            spi_data = [0x00, 0x00, 0x00] + encode_led_data(individual_led_state)
-            spi.xfer2(spi_data)
-            time.sleep(0.001)  # Small delay for LED latch
-            update_count += 1
-            return True
-        except Exception as e:
-            print(f"Error updating LED {index}: {e}")
-            return False
+    with pending_cond:
+        # Update the specific LED in our state (wire order)
+        individual_led_state[3 * index:3 * index + 3] = to_wire_order(r, g, b)
+        pending['rgb'] = pending['solid'] = None  # The strip is no longer a solid color
+        pending['dirty'] = True
+        # LEDs are addressed by position, so everything up to this one is resent
+        pending['count'] = max(pending['count'], index + 1)
+        pending_cond.notify()
+    return True
 
-class LEDRequestHandler(http.server.SimpleHTTPRequestHandler):
-    """HTTP request handler for LED control interface."""
+def led_writer_loop():
+    """Push the latest LED state to the strip; runs forever in a daemon thread."""
+    while True:
+        with pending_cond:
+            while not pending['dirty']:
+                pending_cond.wait()
+            rgb = pending['rgb']
+            grb = None if rgb else bytes(individual_led_state[:3 * pending['count']])
+            pending['rgb'] = None
+            pending['dirty'] = False
+            pending['count'] = 0
+        if rgb:
+            ok = update_leds(*rgb)  # Solid colors use the cached frame
+        else:
+            ok = update_strip(grb)
+        if not ok:
+            with pending_cond:
+                # The strip may not show the color, so don't skip a repeat of it,
+                # and resend every LED next time since partial updates assume
+                # the LEDs after the changed ones are already correct
+                pending['solid'] = None
+                pending['count'] = NUM_LEDS
+        time.sleep(0.002)  # Cap the SPI update rate during bursts
+
+# === HTML Pages ===
+# Pages are built once at import time rather than per request
+
+# Static API documentation page
+DOCS_HTML = bytes("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>API Documentation - WS2812B LED Controller</title>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <style>
+            body { font-family: monospace; padding: 20px; max-width: 800px; margin: 0 auto; }
+            h1, h2 { color: #333; }
+            .endpoint { background: #f4f4f4; padding: 15px; margin: 10px 0; border-radius: 5px; }
+            .method { color: #0066cc; font-weight: bold; }
+            .path { color: #006600; }
+            code { background: #e8e8e8; padding: 2px 5px; border-radius: 3px; }
+            .example { background: #e8f4f8; padding: 10px; margin: 5px 0; border-left: 3px solid #0066cc; }
+        </style>
+    </head>
+    <body>
+        <h1>🌈 WS2812B LED Controller API</h1>
+        <p>Control your RGB LED strip via HTTP requests.</p>
+        
+        <div class="endpoint">
+            <h2><span class="method">GET</span> <span class="path">/</span></h2>
+            <p><strong>Description:</strong> Web-based control interface with color sliders</p>
+            <div class="example">
+                <strong>Try it:</strong> <a href="/">Open Control Panel</a>
+            </div>
+        </div>
+        
+        <div class="endpoint">
+            <h2><span class="method">GET</span> <span class="path">/update</span></h2>
+            <p><strong>Description:</strong> Update all LED colors</p>
+            <p><strong>Query Parameters:</strong></p>
+            <ul>
+                <li><code>r</code> - Red value (0-255, optional)</li>
+                <li><code>g</code> - Green value (0-255, optional)</li>
+                <li><code>b</code> - Blue value (0-255, optional)</li>
+                <li><code>c</code> - All three as a hex color, e.g. <code>ff8000</code> (optional, instead of r, g, b)</li>
+            </ul>
+            <p><strong>Response:</strong> <code>204 No Content</code> on success</p>
+            <div class="example">
+                <strong>Examples:</strong><br>
+                <a href="/update?r=255&g=0&b=0">/update?r=255&g=0&b=0</a> - Red<br>
+                <a href="/update?r=0&g=255&b=0">/update?r=0&g=255&b=0</a> - Green<br>
+                <a href="/update?r=0&g=0&b=255">/update?r=0&g=0&b=255</a> - Blue<br>
+                <a href="/update?r=255&g=255&b=255">/update?r=255&g=255&b=255</a> - White<br>
+                <a href="/update?r=0&g=0&b=0">/update?r=0&g=0&b=0</a> - Off<br>
+                <a href="/update?c=ff8000">/update?c=ff8000</a> - Orange
+            </div>
+        </div>
+        
+        <div class="endpoint">
+            <h2><span class="method">GET</span> <span class="path">/update_led</span></h2>
+            <p><strong>Description:</strong> Update a single LED color</p>
+            <p><strong>Query Parameters:</strong></p>
+            <ul>
+                <li><code>index</code> - LED index (0-15, required)</li>
+                <li><code>r</code> - Red value (0-255, required)</li>
+                <li><code>g</code> - Green value (0-255, required)</li>
+                <li><code>b</code> - Blue value (0-255, required)</li>
+                <li><code>c</code> - All three as a hex color, e.g. <code>ff8000</code> (instead of r, g, b)</li>
+            </ul>
+            <p><strong>Response:</strong> JSON with status and LED info</p>
+            <div class="example">
+                <strong>Examples:</strong><br>
+                <a href="/update_led?index=0&r=255&g=0&b=0">/update_led?index=0&r=255&g=0&b=0</a> - First LED red<br>
+                <a href="/update_led?index=5&r=0&g=255&b=0">/update_led?index=5&r=0&g=255&b=0</a> - LED 5 green<br>
+                <a href="/update_led?index=15&r=0&g=0&b=255">/update_led?index=15&r=0&g=0&b=255</a> - Last LED blue<br>
+                <a href="/update_led?index=0&r=0&g=0&b=0">/update_led?index=0&r=0&g=0&b=0</a> - Turn off first LED
+            </div>
+        </div>
+        
+        <div class="endpoint">
+            <h2><span class="method">GET</span> <span class="path">/health</span></h2>
+            <p><strong>Description:</strong> System health check and statistics</p>
+            <p><strong>Response:</strong> JSON object with system information</p>
+            <div class="example">
+                <strong>Try it:</strong> <a href="/health">View Health Status</a>
+            </div>
+            <p><strong>Response Fields:</strong></p>
+            <ul>
+                <li><code>status</code> - Server status</li>
+                <li><code>uptime</code> - Server uptime</li>
+                <li><code>updates_processed</code> - Total LED updates</li>
+                <li><code>num_leds</code> - Number of LEDs</li>
+                <li><code>current_color</code> - Current RGB values</li>
+                <li><code>system</code> - Platform and resource stats</li>
+            </ul>
+        </div>
+        
+        <div class="endpoint">
+            <h2><span class="method">GET</span> <span class="path">/api/docs</span></h2>
+            <p><strong>Description:</strong> This documentation page</p>
+        </div>
+        
+        <hr>
+        <p><a href="/">← Back to Control Panel</a></p>
+    </body>
+    </html>
+""", "utf-8")
+
+def make_page(body):
+    """
+    Prepare an HTML body for serving, with a gzip copy for clients that accept it.
     
-    def log_message(self, format, *args):
-        """Override to provide cleaner logging."""
-        # Only log errors, not every request
-        if args[1] != '200':
-            super().log_message(format, *args)
+    Args:
+        body: UTF-8 encoded HTML page
     
-    def do_GET(self):
-        """Handle GET requests for both the web UI and LED updates."""
+    Returns:
+        dict: body, gzip-compressed body and quoted ETag of the page
+    """
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'etag': '"' + hashlib.md5(body).hexdigest() + '"',
+    }
+
+DOCS_PAGE = make_page(DOCS_HTML)
+
+# Web control interface template with num_leds, r, g, b fields
+INDEX_TEMPLATE = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>RGB + White LED Control</title>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <style>
+            /* Solarized Light Theme */
+            :root {{
+                --base03: #002b36;
+                --base02: #073642;
+                --base01: #586e75;
+                --base00: #657b83;
+                --base0: #839496;
+                --base1: #93a1a1;
+                --base2: #eee8d5;
+                --base3: #fdf6e3;
+                --yellow: #b58900;
+                --orange: #cb4b16;
+                --red: #dc322f;
+                --magenta: #d33682;
+                --violet: #6c71c4;
+                --blue: #268bd2;
+                --cyan: #2aa198;
+                --green: #859900;
+            }}
+            
+            body {{
+                font-family: sans-serif;
+                padding: 20px;
+                max-width: 600px;
+                margin: 0 auto;
+                background-color: var(--base3);
+                color: var(--base00);
+                transition: background-color 0.3s, color 0.3s;
+            }}
+            
+            /* Dark mode */
+            body.dark-mode {{
+                background-color: var(--base03);
+                color: var(--base0);
+            }}
+            
+            h1 {{
+                color: var(--blue);
+            }}
+            
+            label {{
+                display: block;
+                margin-top: 15px;
+                font-weight: 500;
+            }}
+            
+            .slider {{
+                width: calc(100% - 80px);
+                margin-right: 10px;
+            }}
+            
+            .value-input {{
+                width: 60px;
+                padding: 4px 8px;
+                border: 1px solid var(--base1);
+                background-color: var(--base2);
+                color: var(--base00);
+                border-radius: 3px;
+                font-size: 14px;
+            }}
+            
+            body.dark-mode .value-input {{
+                background-color: var(--base02);
+                color: var(--base0);
+                border-color: var(--base01);
+            }}
+            
+            .slider-container {{
+                display: flex;
+                align-items: center;
+                margin-top: 5px;
+            }}
+            
+            .header {{
+                display: flex;
+                justify-content: space-between;
+                align-items: center;
+                margin-bottom: 20px;
+            }}
+            
+            .links {{
+                font-size: 0.9em;
+            }}
+            
+            .links a {{
+                margin-left: 10px;
+                color: var(--blue);
+                text-decoration: none;
+            }}
+            
+            .links a:hover {{
+                text-decoration: underline;
+                color: var(--cyan);
+            }}
+            
+            .status {{
+                background: var(--base2);
+                padding: 10px;
+                margin: 15px 0;
+                border-radius: 5px;
+                font-size: 0.9em;
+                border-left: 4px solid var(--blue);
+                display: flex;
+                align-items: center;
+                gap: 15px;
+            }}
+            
+            body.dark-mode .status {{
+                background: var(--base02);
+            }}
+            
+            .color-preview {{
+                width: 40px;
+                height: 40px;
+                border-radius: 4px;
+                border: 2px solid var(--base1);
+                flex-shrink: 0;
+            }}
+            
+            body.dark-mode .color-preview {{
+                border-color: var(--base01);
+            }}
+            
+            .footer {{
+                margin-top: 30px;
+                padding-top: 15px;
+                border-top: 1px solid var(--base1);
+                font-size: 0.85em;
+                display: flex;
+                justify-content: space-between;
+                align-items: center;
+                color: var(--base1);
+            }}
+            
+            body.dark-mode .footer {{
+                border-top-color: var(--base01);
+            }}
+            
+            .footer a {{
+                color: var(--blue);
+                text-decoration: none;
+            }}
+            
+            .footer a:hover {{
+                text-decoration: underline;
+            }}
+            
+            .theme-toggle {{
+                cursor: pointer;
+                padding: 5px 10px;
+                background-color: var(--base2);
+                border: 1px solid var(--base1);
+                border-radius: 4px;
+                color: var(--base00);
+                font-size: 0.85em;
+            }}
+            
+            body.dark-mode .theme-toggle {{
+                background-color: var(--base02);
+                border-color: var(--base01);
+                color: var(--base0);
+            }}
+            
+            .theme-toggle:hover {{
+                background-color: var(--cyan);
+                color: var(--base3);
+                border-color: var(--cyan);
+            }}
+            
+            .color-picker-wrapper {{
+                position: relative;
+                cursor: pointer;
+            }}
+            
+            #color_picker {{
+                position: absolute;
+                top: 0;
+                left: 0;
+                opacity: 0;
+                width: 100%;
+                height: 100%;
+                cursor: pointer;
+                border: none;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>LED Controller</h1>
+            <div class="links">
+                <a href="/health" target="_blank">📊 Health</a>
+                <a href="/api/docs" target="_blank">📖 API Docs</a>
+            </div>
+        </div>
+        <div class="status">
+            <div class="color-picker-wrapper">
+                <div class="color-preview" id="color_preview"></div>
+                <input type="color" id="color_picker" title="Click to pick a color">
+            </div>
+            <div>
+                <strong>LEDs:</strong> {num_leds} | 
+                <span id="rgb_display"></span> | 
+                <span id="hex_display" style="cursor: pointer; user-select: all;" title="Click to edit"></span>
+                <input type="text" id="hex_input" style="display: none; width: 80px; padding: 2px 4px; font-family: monospace;" maxlength="7" pattern="#[0-9A-Fa-f]{{6}}">
+            </div>
+        </div>
+        <label>
+            White:
+            <div class="slider-container">
+                <input type="range" min="0" max="255" value="{r}" id="w" class="slider">
+                <input type="number" min="0" max="255" value="{r}" id="w_val" class="value-input">
+            </div>
+        </label>
+
+        <label>
+            Red:
+            <div class="slider-container">
+                <input type="range" min="0" max="255" value="{r}" id="r" class="slider">
+                <input type="number" min="0" max="255" value="{r}" id="r_val" class="value-input">
+            </div>
+        </label>
+        <label>
+            Green:
+            <div class="slider-container">
+                <input type="range" min="0" max="255" value="{g}" id="g" class="slider">
+                <input type="number" min="0" max="255" value="{g}" id="g_val" class="value-input">
+            </div>
+        </label>
+        <label>
+            Blue:
+            <div class="slider-container">
+                <input type="range" min="0" max="255" value="{b}" id="b" class="slider">
+                <input type="number" min="0" max="255" value="{b}" id="b_val" class="value-input">
+            </div>
+        </label>
         
-        # Health check endpoint with system stats
-        if self.path == "/health":
-            try:
-                uptime_seconds = time.time() - server_start_time
-                uptime_str = f"{int(uptime_seconds // 3600)}h {int((uptime_seconds % 3600) // 60)}m {int(uptime_seconds % 60)}s"
+        <div class="footer">
+            <div>
+                <a href="https://github.com/platima/Python-WS2812B" target="_blank">🔗 GitHub Repository</a>
+            </div>
+            <div>
+                <button class="theme-toggle" id="theme_toggle">Switch to Light Mode</button>
+            </div>
+        </div>
+
+        <script>
+            // Cookie management
+            function setCookie(name, value, days) {{
+                const d = new Date();
+                d.setTime(d.getTime() + (days * 24 * 60 * 60 * 1000));
+                document.cookie = name + "=" + value + ";expires=" + d.toUTCString() + ";path=/";
+            }}
+            
+            function getCookie(name) {{
+                // Scan for "; name=" directly instead of splitting every cookie;
+                // the leading "; " keeps e.g. "xtheme" from matching "theme"
+                const cookies = "; " + document.cookie;
+                const nameEQ = "; " + name + "=";
+                const idx = cookies.indexOf(nameEQ);
+                if (idx < 0) return null;
+                const start = idx + nameEQ.length;
+                const end = cookies.indexOf(';', start);
+                return cookies.substring(start, end < 0 ? cookies.length : end);
+            }}
+            
+            // Dark mode detection and handling
+            function setDarkMode(isDark, updateToggle = true) {{
+                if (isDark) {{
+                    document.body.classList.add('dark-mode');
+                    if (updateToggle) {{
+                        document.getElementById('theme_toggle').textContent = 'Switch to Light Mode';
+                    }}
+                }} else {{
+                    document.body.classList.remove('dark-mode');
+                    if (updateToggle) {{
+                        document.getElementById('theme_toggle').textContent = 'Switch to Dark Mode';
+                    }}
+                }}
+            }}
+            
+            // Check for saved preference first, then system preference
+            const savedTheme = getCookie('theme');
+            if (savedTheme) {{
+                setDarkMode(savedTheme === 'dark');
+            }} else if (window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches) {{
+                setDarkMode(true);
+            }} else {{
+                setDarkMode(false);
+            }}
+            
+            // Theme toggle button
+            document.getElementById('theme_toggle').addEventListener('click', function() {{
+                const isDark = document.body.classList.contains('dark-mode');
+                setDarkMode(!isDark);
+                setCookie('theme', !isDark ? 'dark' : 'light', 365);
+            }});
+            
+            // Listen for system theme changes (only if no saved preference)
+            if (window.matchMedia && !savedTheme) {{
+                window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change', event => {{
+                    if (!getCookie('theme')) {{
+                        setDarkMode(event.matches);
+                    }}
+                }});
+            }}
+            
+            function toHex(r, g, b) {{
+                return '#' + ((1 << 24) | (r << 16) | (g << 8) | b).toString(16).slice(1);
+            }}
+            
+            function updateColorPreview(r, g, b) {{
+                const preview = document.getElementById('color_preview');
+                preview.style.backgroundColor = `rgb(${{r}}, ${{g}}, ${{b}})`;
+                
+                // Update RGB display
+                document.getElementById('rgb_display').textContent = `rgb(${{r}},${{g}},${{b}})`;
+                
+                // Update hex display
+                document.getElementById('hex_display').textContent = toHex(r, g, b);
+            }}
+            
+            // Hex editing functionality
+            const hexDisplay = document.getElementById('hex_display');
+            const hexInput = document.getElementById('hex_input');
+            
+            hexDisplay.addEventListener('click', function() {{
+                hexInput.value = hexDisplay.textContent;
+                hexDisplay.style.display = 'none';
+                hexInput.style.display = 'inline';
+                hexInput.focus();
+                hexInput.select();
+            }});
+            
+            hexInput.addEventListener('blur', function() {{
+                applyHexInput();
+            }});
+            
+            hexInput.addEventListener('keydown', function(e) {{
+                if (e.key === 'Enter') {{
+                    applyHexInput();
+                }} else if (e.key === 'Escape') {{
+                    hexInput.style.display = 'none';
+                    hexDisplay.style.display = 'inline';
+                }}
+            }});
+            
+            function applyHexInput() {{
+                const hexValue = hexInput.value.trim();
+                const hexRegex = /^#?([0-9A-Fa-f]{{6}})$/;
+                const match = hexValue.match(hexRegex);
+                
+                if (match) {{
+                    const hex = match[1];
+                    const r = parseInt(hex.substring(0, 2), 16);
+                    const g = parseInt(hex.substring(2, 4), 16);
+                    const b = parseInt(hex.substring(4, 6), 16);
+                    
+                    // Update all controls
+                    document.getElementById("r").value = r;
+                    document.getElementById("r_val").value = r;
+                    document.getElementById("g").value = g;
+                    document.getElementById("g_val").value = g;
+                    document.getElementById("b").value = b;
+                    document.getElementById("b_val").value = b;
+                    
+                    sendUpdate(r, g, b);
+                }}
+                
+                hexInput.style.display = 'none';
+                hexDisplay.style.display = 'inline';
+            }}
+            
+            // Slider drags fire many input events per frame; only the latest
+            // color is sent, at most once per animation frame
+            let pendingColor = null;
+            
+            function sendUpdate(r, g, b) {{
+                if (pendingColor === null) {{
+                    requestAnimationFrame(flushUpdate);
+                }}
+                pendingColor = [r, g, b];
+            }}
+            
+            function flushUpdate() {{
+                const [r, g, b] = pendingColor;
+                pendingColor = null;
+                const hex = toHex(r, g, b);
+                fetch('/update?c=' + hex.slice(1));
+                updateColorPreview(r, g, b);
+                
+                // Update color picker
+                document.getElementById('color_picker').value = hex;
+            }}
+            
+            // Color picker functionality
+            document.getElementById('color_picker').addEventListener('input', function(e) {{
+                const hex = e.target.value;
+                const r = parseInt(hex.substring(1, 3), 16);
+                const g = parseInt(hex.substring(3, 5), 16);
+                const b = parseInt(hex.substring(5, 7), 16);
                 
-                with lock:
-                    current_state = led_state.copy()
+                // Update all controls
+                document.getElementById("r").value = r;
+                document.getElementById("r_val").value = r;
+                document.getElementById("g").value = g;
+                document.getElementById("g_val").value = g;
+                document.getElementById("b").value = b;
+                document.getElementById("b_val").value = b;
                 
-                # Build system stats using native Python functions
-                system_stats = {
-                    "platform": platform.system(),
-                    "platform_release": platform.release(),
-                    "python_version": platform.python_version(),
-                    "cpu_count": get_cpu_count(),
-                }
+                sendUpdate(r, g, b);
+            }});
+
+            function updateFromRGB() {{
+                let r = parseInt(document.getElementById("r").value);
+                let g = parseInt(document.getElementById("g").value);
+                let b = parseInt(document.getElementById("b").value);
+                
+                // Sync slider and input
+                document.getElementById("r_val").value = r;
+                document.getElementById("g_val").value = g;
+                document.getElementById("b_val").value = b;
+                
+                sendUpdate(r, g, b);
+            }}
+            
+            function updateFromRGBInput() {{
+                let r = Math.max(0, Math.min(255, parseInt(document.getElementById("r_val").value) || 0));
+                let g = Math.max(0, Math.min(255, parseInt(document.getElementById("g_val").value) || 0));
+                let b = Math.max(0, Math.min(255, parseInt(document.getElementById("b_val").value) || 0));
                 
-                # Add Linux-specific stats if available
-                memory_info = get_memory_info()
-                if "note" not in memory_info:
-                    system_stats["memory"] = memory_info
+                // Sync slider and input
+                document.getElementById("r").value = r;
+                document.getElementById("r_val").value = r;
+                document.getElementById("g").value = g;
+                document.getElementById("g_val").value = g;
+                document.getElementById("b").value = b;
+                document.getElementById("b_val").value = b;
                 
-                load_avg = get_load_average()
-                if load_avg:
-                    system_stats["load_average"] = [round(x, 2) for x in load_avg]
+                sendUpdate(r, g, b);
+            }}
+
+            function updateFromWhite() {{
+                let w = parseInt(document.getElementById("w").value);
+                document.getElementById("w_val").value = w;
                 
-                cpu_temp = get_cpu_temp()
-                if cpu_temp:
-                    system_stats["cpu_temp_c"] = cpu_temp
+                // Set RGB sliders and inputs to match white
+                ['r', 'g', 'b'].forEach(id => {{
+                    document.getElementById(id).value = w;
+                    document.getElementById(id + "_val").value = w;
+                }});
                 
-                system_uptime = get_uptime()
-                if system_uptime != "unknown":
-                    system_stats["system_uptime"] = system_uptime
+                sendUpdate(w, w, w);
+            }}
+            
+            function updateFromWhiteInput() {{
+                let w = Math.max(0, Math.min(255, parseInt(document.getElementById("w_val").value) || 0));
+                document.getElementById("w").value = w;
+                document.getElementById("w_val").value = w;
                 
-                health_data = {
-                    "status": "ok",
-                    "server_uptime_seconds": round(uptime_seconds, 2),
-                    "server_uptime": uptime_str,
-                    "updates_processed": update_count,
-                    "num_leds": NUM_LEDS,
-                    "current_color": current_state,
-                    "system": system_stats
-                }
+                // Set RGB sliders and inputs to match white
+                ['r', 'g', 'b'].forEach(id => {{
+                    document.getElementById(id).value = w;
+                    document.getElementById(id + "_val").value = w;
+                }});
                 
+                sendUpdate(w, w, w);
+            }}
+
+            // Attach event listeners for sliders
+            document.getElementById("w").addEventListener("input", updateFromWhite);
+            document.getElementById("r").addEventListener("input", updateFromRGB);
+            document.getElementById("g").addEventListener("input", updateFromRGB);
+            document.getElementById("b").addEventListener("input", updateFromRGB);
+            
+            // Attach event listeners for number inputs
+            document.getElementById("w_val").addEventListener("input", updateFromWhiteInput);
+            document.getElementById("r_val").addEventListener("input", updateFromRGBInput);
+            document.getElementById("g_val").addEventListener("input", updateFromRGBInput);
+            document.getElementById("b_val").addEventListener("input", updateFromRGBInput);
+            
+            // Initialize color preview
+            updateColorPreview({r}, {g}, {b});
+        </script>
+    </body>
+    </html>
+"""
+
+def split_template(template, **static):
+    """
+    Split a str.format() template into pre-encoded literal chunks.
+    
+    Fields given in static are substituted once here; the remaining fields
+    are left for render time, so rendering only has to join bytes.
+    
+    Args:
+        template: Template string using str.format() fields
+        **static: Field values that never change
+        
+    Returns:
+        tuple: (list of bytes chunks, list of field names between them)
+    """
+    chunks = []
+    fields = []
+    literal = ''
+    for text, field, _, _ in string.Formatter().parse(template):
+        literal += text
+        if field is None:
+            continue
+        if field in static:
+            literal += str(static[field])
+            continue
+        chunks.append(literal.encode("utf-8"))
+        fields.append(field)
+        literal = ''
+    chunks.append(literal.encode("utf-8"))
+    return chunks, fields
+
+INDEX_CHUNKS, INDEX_FIELDS = split_template(INDEX_TEMPLATE, num_leds=NUM_LEDS)
+
+# Rendered control page, rebuilt only when the LED color changes
+_index_cache = {'rgb': None, 'page': None}
+
+def render_index():
+    """
+    Render the web control interface for the current LED state.
+    
+    Returns:
+        dict: page as built by make_page()
+    """
+    global _index_cache
+    
+    rgb = led_state
+    cached = _index_cache  # Snapshot so a concurrent rebuild can't mix entries
+    if cached['rgb'] == rgb:
+        return cached['page']
+    values = dict(zip('rgb', (str(v).encode() for v in rgb)))
+    parts = [INDEX_CHUNKS[0]]
+    for field, chunk in zip(INDEX_FIELDS, INDEX_CHUNKS[1:]):
+        parts.append(values[field])
+        parts.append(chunk)
+    page = make_page(b''.join(parts))
+    _index_cache = {'rgb': rgb, 'page': page}
+    return page
+
+def get_health_body():
+    """
+    Build the /health JSON response body.
+    
+    The serialized body is cached for HEALTH_CACHE_TTL seconds (or until the
+    next LED update) so frequent polling doesn't re-read /proc on every hit.
+    
+    Returns:
+        bytes: JSON-encoded health data
+    """
+    with health_lock:
+        now = time.monotonic()
+        if now < _health_cache['expires'] and _health_cache['update_count'] == update_count:
+            return _health_cache['body']
+        
+        uptime_seconds = time.time() - server_start_time
+        uptime_str = f"{int(uptime_seconds // 3600)}h {int((uptime_seconds % 3600) // 60)}m {int(uptime_seconds % 60)}s"
+        
+        r, g, b = led_state
+        current_state = {'r': r, 'g': g, 'b': b}
+        current_count = update_count
+        
+        # Build system stats using native Python functions
+        system_stats = {
+            "platform": platform.system(),
+            "platform_release": platform.release(),
+            "python_version": platform.python_version(),
+            "cpu_count": get_cpu_count(),
+        }
+        
+        # Add Linux-specific stats if available
+        memory_info = get_memory_info()
+        if "note" not in memory_info:
+            system_stats["memory"] = memory_info
+        
+        load_avg = get_load_average()
+        if load_avg:
+            system_stats["load_average"] = [round(x, 2) for x in load_avg]
+        
+        cpu_temp = get_cpu_temp()
+        if cpu_temp:
+            system_stats["cpu_temp_c"] = cpu_temp
+        
+        system_uptime = get_uptime()
+        if system_uptime != "unknown":
+            system_stats["system_uptime"] = system_uptime
+        
+        health_data = {
+            "status": "ok",
+            "server_uptime_seconds": round(uptime_seconds, 2),
+            "server_uptime": uptime_str,
+            "updates_processed": current_count,
+            "num_leds": NUM_LEDS,
+            "current_color": current_state,
+            "system": system_stats
+        }
+        
+        body = json.dumps(health_data, separators=(',', ':')).encode()
+        _health_cache.update({'expires': now + HEALTH_CACHE_TTL, 'update_count': current_count, 'body': body})
+        return body
+
+def parse_led_query(query, index=-1, r=0, g=0, b=0):
+    """
+    Parse the index, r, g, b and c parameters from a query string.
+    
+    The LED endpoints only ever take these few small parameters, so the query
+    is split by hand rather than going through urllib.parse. Unknown and
+    blank parameters are ignored. c is a 6-digit hex color (RRGGBB) that
+    sets r, g and b in one parameter.
+    
+    Args:
+        query: Query string (the part of the path after '?')
+        index, r, g, b: Values to use for parameters that are not given
+    
+    Returns:
+        tuple: (index, r, g, b)
+    
+    Raises:
+        ValueError: If a parameter is not an integer or c is not RRGGBB hex
+    """
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        if not value:
+            continue
+        if key == "r":
+            r = int(value)
+        elif key == "g":
+            g = int(value)
+        elif key == "b":
+            b = int(value)
+        elif key == "c":
+            if len(value) != 6 or not all(ch in string.hexdigits for ch in value):
+                raise ValueError(f"Invalid color: {value}. Must be RRGGBB hex")
+            color = int(value, 16)
+            r, g, b = color >> 16, (color >> 8) & 0xFF, color & 0xFF
+        elif key == "index":
+            index = int(value)
+    return index, r, g, b
+
+class LEDRequestHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP request handler for LED control interface."""
+    
+    # HTTP/1.1 keeps connections alive between requests, so every response
+    # must send a Content-Length header
+    protocol_version = "HTTP/1.1"
+    # Send small responses immediately (TCP_NODELAY) instead of letting Nagle's
+    # algorithm hold them back waiting for the client's delayed ACK
+    disable_nagle_algorithm = True
+    
+    def send_not_modified(self, etag):
+        """
+        Answer with 304 Not Modified if the client already has this ETag.
+        
+        Returns:
+            bool: True if a 304 was sent and the caller should stop
+        """
+        if self.headers.get("If-None-Match") != etag:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        return True
+    
+    def send_page(self, page, cache_control):
+        """
+        Send an HTML page, gzip-compressed if the client accepts it.
+        
+        Args:
+            page: dict as built by make_page()
+            cache_control: value for the Cache-Control header
+        """
+        use_gzip = 'gzip' in self.headers.get("Accept-Encoding", "")
+        # Each encoding is a separate representation, so it gets its own ETag
+        etag = page['etag'][:-1] + '-gz"' if use_gzip else page['etag']
+        if self.send_not_modified(etag):
+            return
+        body = page['gzip'] if use_gzip else page['body']
+        self.send_response(200)
+        self.send_header("Content-type", "text/html; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_json(self, status, data):
+        """Send a JSON response with the given HTTP status code."""
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Override to provide cleaner, non-blocking logging."""
+        # Only log errors, not every successful (2xx) or cached (3xx) request
+        if len(args) < 2 or not args[1].startswith(('2', '3')):
+            log(f"{self.address_string()} - {format % args}")
+    
+    def do_GET(self):
+        """Handle GET requests for both the web UI and LED updates."""
+        # Split off the query once; routes are matched exactly on the path
+        route, _, query = self.path.partition("?")
+        
+        # Health check endpoint with system stats
+        if route == "/health":
+            try:
+                body = get_health_body()
                 self.send_response(200)
                 self.send_header("Content-type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", f"max-age={int(HEALTH_CACHE_TTL)}")
                 self.end_headers()
-                self.wfile.write(json.dumps(health_data, indent=2).encode())
+                self.wfile.write(body)
                 return
             except Exception as e:
-                self.send_response(500)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"status": "error", "message": str(e)}).encode())
+                self.send_json(500, {"status": "error", "message": str(e)})
                 return
         
         # API documentation endpoint
-        if self.path == "/api/docs":
-            self.send_response(200)
-            self.send_header("Content-type", "text/html; charset=utf-8")
-            self.end_headers()
-            self.wfile.write(bytes("""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>API Documentation - WS2812B LED Controller</title>
-                    <meta charset="utf-8">
-                    <meta name="viewport" content="width=device-width, initial-scale=1">
-                    <style>
-                        body { font-family: monospace; padding: 20px; max-width: 800px; margin: 0 auto; }
-                        h1, h2 { color: #333; }
-                        .endpoint { background: #f4f4f4; padding: 15px; margin: 10px 0; border-radius: 5px; }
-                        .method { color: #0066cc; font-weight: bold; }
-                        .path { color: #006600; }
-                        code { background: #e8e8e8; padding: 2px 5px; border-radius: 3px; }
-                        .example { background: #e8f4f8; padding: 10px; margin: 5px 0; border-left: 3px solid #0066cc; }
-                    </style>
-                </head>
-                <body>
-                    <h1>🌈 WS2812B LED Controller API</h1>
-                    <p>Control your RGB LED strip via HTTP requests.</p>
-                    
-                    <div class="endpoint">
-                        <h2><span class="method">GET</span> <span class="path">/</span></h2>
-                        <p><strong>Description:</strong> Web-based control interface with color sliders</p>
-                        <div class="example">
-                            <strong>Try it:</strong> <a href="/">Open Control Panel</a>
-                        </div>
-                    </div>
-                    
-                    <div class="endpoint">
-                        <h2><span class="method">GET</span> <span class="path">/update</span></h2>
-                        <p><strong>Description:</strong> Update all LED colors</p>
-                        <p><strong>Query Parameters:</strong></p>
-                        <ul>
-                            <li><code>r</code> - Red value (0-255, optional)</li>
-                            <li><code>g</code> - Green value (0-255, optional)</li>
-                            <li><code>b</code> - Blue value (0-255, optional)</li>
-                        </ul>
-                        <p><strong>Response:</strong> Plain text "OK" on success</p>
-                        <div class="example">
-                            <strong>Examples:</strong><br>
-                            <a href="/update?r=255&g=0&b=0">/update?r=255&g=0&b=0</a> - Red<br>
-                            <a href="/update?r=0&g=255&b=0">/update?r=0&g=255&b=0</a> - Green<br>
-                            <a href="/update?r=0&g=0&b=255">/update?r=0&g=0&b=255</a> - Blue<br>
-                            <a href="/update?r=255&g=255&b=255">/update?r=255&g=255&b=255</a> - White<br>
-                            <a href="/update?r=0&g=0&b=0">/update?r=0&g=0&b=0</a> - Off
-                        </div>
-                    </div>
-                    
-                    <div class="endpoint">
-                        <h2><span class="method">GET</span> <span class="path">/update_led</span></h2>
-                        <p><strong>Description:</strong> Update a single LED color</p>
-                        <p><strong>Query Parameters:</strong></p>
-                        <ul>
-                            <li><code>index</code> - LED index (0-15, required)</li>
-                            <li><code>r</code> - Red value (0-255, required)</li>
-                            <li><code>g</code> - Green value (0-255, required)</li>
-                            <li><code>b</code> - Blue value (0-255, required)</li>
-                        </ul>
-                        <p><strong>Response:</strong> JSON with status and LED info</p>
-                        <div class="example">
-                            <strong>Examples:</strong><br>
-                            <a href="/update_led?index=0&r=255&g=0&b=0">/update_led?index=0&r=255&g=0&b=0</a> - First LED red<br>
-                            <a href="/update_led?index=5&r=0&g=255&b=0">/update_led?index=5&r=0&g=255&b=0</a> - LED 5 green<br>
-                            <a href="/update_led?index=15&r=0&g=0&b=255">/update_led?index=15&r=0&g=0&b=255</a> - Last LED blue<br>
-                            <a href="/update_led?index=0&r=0&g=0&b=0">/update_led?index=0&r=0&g=0&b=0</a> - Turn off first LED
-                        </div>
-                    </div>
-                    
-                    <div class="endpoint">
-                        <h2><span class="method">GET</span> <span class="path">/health</span></h2>
-                        <p><strong>Description:</strong> System health check and statistics</p>
-                        <p><strong>Response:</strong> JSON object with system information</p>
-                        <div class="example">
-                            <strong>Try it:</strong> <a href="/health">View Health Status</a>
-                        </div>
-                        <p><strong>Response Fields:</strong></p>
-                        <ul>
-                            <li><code>status</code> - Server status</li>
-                            <li><code>uptime</code> - Server uptime</li>
-                            <li><code>updates_processed</code> - Total LED updates</li>
-                            <li><code>num_leds</code> - Number of LEDs</li>
-                            <li><code>current_color</code> - Current RGB values</li>
-                            <li><code>system</code> - Platform and resource stats</li>
-                        </ul>
-                    </div>
-                    
-                    <div class="endpoint">
-                        <h2><span class="method">GET</span> <span class="path">/api/docs</span></h2>
-                        <p><strong>Description:</strong> This documentation page</p>
-                    </div>
-                    
-                    <hr>
-                    <p><a href="/">← Back to Control Panel</a></p>
-                </body>
-                </html>
-            """, "utf-8"))
+        if route == "/api/docs":
+            self.send_page(DOCS_PAGE, "max-age=3600")
             return
         
         # API endpoint for updating individual LED
-        if self.path.startswith("/update_led"):
-            parsed = urllib.parse.urlparse(self.path)
-            query = urllib.parse.parse_qs(parsed.query)
+        if route == "/update_led":
             try:
                 # Parse LED index and RGB values
-                index = int(query.get("index", [-1])[0])
-                r = int(query.get("r", [0])[0])
-                g = int(query.get("g", [0])[0])
-                b = int(query.get("b", [0])[0])
+                index, r, g, b = parse_led_query(query)
                 
                 # Validate index
                 if index < 0 or index >= NUM_LEDS:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(json.dumps({"error": f"Invalid index: {index}. Must be 0-{NUM_LEDS-1}"}).encode())
+                    self.send_json(400, {"error": f"Invalid index: {index}. Must be 0-{NUM_LEDS-1}"})
                     return
                 
                 # Clamp RGB values to valid range (0-255)
-                r = max(0, min(255, r))
-                g = max(0, min(255, g))
-                b = max(0, min(255, b))
+                r, g, b = clamp8(r), clamp8(g), clamp8(b)
                 
-                # Send to LED
+                # Queue for the LED writer thread
                 success = update_individual_led(index, r, g, b)
                 
                 if success:
-                    self.send_response(200)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(json.dumps({"status": "ok", "index": index, "r": r, "g": g, "b": b}).encode())
+                    self.send_json(200, {"status": "ok", "index": index, "r": r, "g": g, "b": b})
                 else:
-                    self.send_response(500)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(json.dumps({"error": "Failed to update LED"}).encode())
+                    self.send_json(500, {"error": "Failed to update LED"})
                 return
             except Exception as e:
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": f"Bad request: {str(e)}"}).encode())
+                self.send_json(400, {"error": f"Bad request: {str(e)}"})
                 return
         
         # API endpoint for updating all LED colors
-        if self.path.startswith("/update"):
-            parsed = urllib.parse.urlparse(self.path)
-            query = urllib.parse.parse_qs(parsed.query)
+        if route == "/update":
             try:
-                # Parse RGB values from query string, defaulting to current state
-                # Use lock to safely read current state
-                with lock:
-                    default_r = led_state['r']
-                    default_g = led_state['g']
-                    default_b = led_state['b']
-                
-                r = int(query.get("r", [default_r])[0])
-                g = int(query.get("g", [default_g])[0])
-                b = int(query.get("b", [default_b])[0])
+                # Parse RGB values from query string; missing ones (None) keep
+                # their current value
+                _, r, g, b = parse_led_query(query, -1, None, None, None)
                 
-                # Clamp values to valid range (0-255)
-                r = max(0, min(255, r))
-                g = max(0, min(255, g))
-                b = max(0, min(255, b))
+                # Hand off to the LED writer thread; the SPI transfer happens there.
+                # This also clamps the values and records the new led_state
+                queue_led_update(r, g, b)
                 
-                # Update global state AND send to LEDs atomically (fixes race condition)
-                with lock:
-                    led_state.update({'r': r, 'g': g, 'b': b})
-                
-                # Send to LEDs (this also uses the lock internally)
-                success = update_leds(r, g, b)
-                
-                if success:
-                    self.send_response(200)
-                    self.end_headers()
-                    self.wfile.write(b'OK')
-                else:
-                    self.send_response(500)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(json.dumps({"error": "Failed to update LEDs"}).encode())
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
                 return
             except Exception as e:
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": f"Bad request: {str(e)}"}).encode())
+                self.send_json(400, {"error": f"Bad request: {str(e)}"})
                 return
 
         # Serve the web control interface
-        self.send_response(200)
-        self.send_header("Content-type", "text/html; charset=utf-8")
-        self.end_headers()
-        self.wfile.write(bytes(f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>RGB + White LED Control</title>
-                <meta charset="utf-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1">
-                <style>
-                    /* Solarized Light Theme */
-                    :root {{
-                        --base03: #002b36;
-                        --base02: #073642;
-                        --base01: #586e75;
-                        --base00: #657b83;
-                        --base0: #839496;
-                        --base1: #93a1a1;
-                        --base2: #eee8d5;
-                        --base3: #fdf6e3;
-                        --yellow: #b58900;
-                        --orange: #cb4b16;
-                        --red: #dc322f;
-                        --magenta: #d33682;
-                        --violet: #6c71c4;
-                        --blue: #268bd2;
-                        --cyan: #2aa198;
-                        --green: #859900;
-                    }}
-                    
-                    body {{
-                        font-family: sans-serif;
-                        padding: 20px;
-                        max-width: 600px;
-                        margin: 0 auto;
-                        background-color: var(--base3);
-                        color: var(--base00);
-                        transition: background-color 0.3s, color 0.3s;
-                    }}
-                    
-                    /* Dark mode */
-                    body.dark-mode {{
-                        background-color: var(--base03);
-                        color: var(--base0);
-                    }}
-                    
-                    h1 {{
-                        color: var(--blue);
-                    }}
-                    
-                    label {{
-                        display: block;
-                        margin-top: 15px;
-                        font-weight: 500;
-                    }}
-                    
-                    .slider {{
-                        width: calc(100% - 80px);
-                        margin-right: 10px;
-                    }}
-                    
-                    .value-input {{
-                        width: 60px;
-                        padding: 4px 8px;
-                        border: 1px solid var(--base1);
-                        background-color: var(--base2);
-                        color: var(--base00);
-                        border-radius: 3px;
-                        font-size: 14px;
-                    }}
-                    
-                    body.dark-mode .value-input {{
-                        background-color: var(--base02);
-                        color: var(--base0);
-                        border-color: var(--base01);
-                    }}
-                    
-                    .slider-container {{
-                        display: flex;
-                        align-items: center;
-                        margin-top: 5px;
-                    }}
-                    
-                    .header {{
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        margin-bottom: 20px;
-                    }}
-                    
-                    .links {{
-                        font-size: 0.9em;
-                    }}
-                    
-                    .links a {{
-                        margin-left: 10px;
-                        color: var(--blue);
-                        text-decoration: none;
-                    }}
-                    
-                    .links a:hover {{
-                        text-decoration: underline;
-                        color: var(--cyan);
-                    }}
-                    
-                    .status {{
-                        background: var(--base2);
-                        padding: 10px;
-                        margin: 15px 0;
-                        border-radius: 5px;
-                        font-size: 0.9em;
-                        border-left: 4px solid var(--blue);
-                        display: flex;
-                        align-items: center;
-                        gap: 15px;
-                    }}
-                    
-                    body.dark-mode .status {{
-                        background: var(--base02);
-                    }}
-                    
-                    .color-preview {{
-                        width: 40px;
-                        height: 40px;
-                        border-radius: 4px;
-                        border: 2px solid var(--base1);
-                        flex-shrink: 0;
-                    }}
-                    
-                    body.dark-mode .color-preview {{
-                        border-color: var(--base01);
-                    }}
-                    
-                    .footer {{
-                        margin-top: 30px;
-                        padding-top: 15px;
-                        border-top: 1px solid var(--base1);
-                        font-size: 0.85em;
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        color: var(--base1);
-                    }}
-                    
-                    body.dark-mode .footer {{
-                        border-top-color: var(--base01);
-                    }}
-                    
-                    .footer a {{
-                        color: var(--blue);
-                        text-decoration: none;
-                    }}
-                    
-                    .footer a:hover {{
-                        text-decoration: underline;
-                    }}
-                    
-                    .theme-toggle {{
-                        cursor: pointer;
-                        padding: 5px 10px;
-                        background-color: var(--base2);
-                        border: 1px solid var(--base1);
-                        border-radius: 4px;
-                        color: var(--base00);
-                        font-size: 0.85em;
-                    }}
-                    
-                    body.dark-mode .theme-toggle {{
-                        background-color: var(--base02);
-                        border-color: var(--base01);
-                        color: var(--base0);
-                    }}
-                    
-                    .theme-toggle:hover {{
-                        background-color: var(--cyan);
-                        color: var(--base3);
-                        border-color: var(--cyan);
-                    }}
-                    
-                    .color-picker-wrapper {{
-                        position: relative;
-                        cursor: pointer;
-                    }}
-                    
-                    #color_picker {{
-                        position: absolute;
-                        top: 0;
-                        left: 0;
-                        opacity: 0;
-                        width: 100%;
-                        height: 100%;
-                        cursor: pointer;
-                        border: none;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>LED Controller</h1>
-                    <div class="links">
-                        <a href="/health" target="_blank">📊 Health</a>
-                        <a href="/api/docs" target="_blank">📖 API Docs</a>
-                    </div>
-                </div>
-                <div class="status">
-                    <div class="color-picker-wrapper">
-                        <div class="color-preview" id="color_preview"></div>
-                        <input type="color" id="color_picker" title="Click to pick a color">
-                    </div>
-                    <div>
-                        <strong>LEDs:</strong> {NUM_LEDS} | 
-                        <span id="rgb_display"></span> | 
-                        <span id="hex_display" style="cursor: pointer; user-select: all;" title="Click to edit"></span>
-                        <input type="text" id="hex_input" style="display: none; width: 80px; padding: 2px 4px; font-family: monospace;" maxlength="7" pattern="#[0-9A-Fa-f]{{6}}">
-                    </div>
-                </div>
-                <label>
-                    White:
-                    <div class="slider-container">
-                        <input type="range" min="0" max="255" value="{led_state['r']}" id="w" class="slider">
-                        <input type="number" min="0" max="255" value="{led_state['r']}" id="w_val" class="value-input">
-                    </div>
-                </label>
-
-                <label>
-                    Red:
-                    <div class="slider-container">
-                        <input type="range" min="0" max="255" value="{led_state['r']}" id="r" class="slider">
-                        <input type="number" min="0" max="255" value="{led_state['r']}" id="r_val" class="value-input">
-                    </div>
-                </label>
-                <label>
-                    Green:
-                    <div class="slider-container">
-                        <input type="range" min="0" max="255" value="{led_state['g']}" id="g" class="slider">
-                        <input type="number" min="0" max="255" value="{led_state['g']}" id="g_val" class="value-input">
-                    </div>
-                </label>
-                <label>
-                    Blue:
-                    <div class="slider-container">
-                        <input type="range" min="0" max="255" value="{led_state['b']}" id="b" class="slider">
-                        <input type="number" min="0" max="255" value="{led_state['b']}" id="b_val" class="value-input">
-                    </div>
-                </label>
-                
-                <div class="footer">
-                    <div>
-                        <a href="https://github.com/platima/Python-WS2812B" target="_blank">🔗 GitHub Repository</a>
-                    </div>
-                    <div>
-                        <button class="theme-toggle" id="theme_toggle">Switch to Light Mode</button>
-                    </div>
-                </div>
+        self.send_page(render_index(), "no-cache")
 
-                <script>
-                    // Cookie management
-                    function setCookie(name, value, days) {{
-                        const d = new Date();
-                        d.setTime(d.getTime() + (days * 24 * 60 * 60 * 1000));
-                        document.cookie = name + "=" + value + ";expires=" + d.toUTCString() + ";path=/";
-                    }}
-                    
-                    function getCookie(name) {{
-                        const nameEQ = name + "=";
-                        const ca = document.cookie.split(';');
-                        for (let i = 0; i < ca.length; i++) {{
-                            let c = ca[i];
-                            while (c.charAt(0) === ' ') c = c.substring(1, c.length);
-                            if (c.indexOf(nameEQ) === 0) return c.substring(nameEQ.length, c.length);
-                        }}
-                        return null;
-                    }}
-                    
-                    // Dark mode detection and handling
-                    function setDarkMode(isDark, updateToggle = true) {{
-                        if (isDark) {{
-                            document.body.classList.add('dark-mode');
-                            if (updateToggle) {{
-                                document.getElementById('theme_toggle').textContent = 'Switch to Light Mode';
-                            }}
-                        }} else {{
-                            document.body.classList.remove('dark-mode');
-                            if (updateToggle) {{
-                                document.getElementById('theme_toggle').textContent = 'Switch to Dark Mode';
-                            }}
-                        }}
-                    }}
-                    
-                    // Check for saved preference first, then system preference
-                    const savedTheme = getCookie('theme');
-                    if (savedTheme) {{
-                        setDarkMode(savedTheme === 'dark');
-                    }} else if (window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches) {{
-                        setDarkMode(true);
-                    }} else {{
-                        setDarkMode(false);
-                    }}
-                    
-                    // Theme toggle button
-                    document.getElementById('theme_toggle').addEventListener('click', function() {{
-                        const isDark = document.body.classList.contains('dark-mode');
-                        setDarkMode(!isDark);
-                        setCookie('theme', !isDark ? 'dark' : 'light', 365);
-                    }});
-                    
-                    // Listen for system theme changes (only if no saved preference)
-                    if (window.matchMedia && !savedTheme) {{
-                        window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change', event => {{
-                            if (!getCookie('theme')) {{
-                                setDarkMode(event.matches);
-                            }}
-                        }});
-                    }}
-                    
-                    function updateColorPreview(r, g, b) {{
-                        const preview = document.getElementById('color_preview');
-                        preview.style.backgroundColor = `rgb(${{r}}, ${{g}}, ${{b}})`;
-                        
-                        // Update RGB display
-                        document.getElementById('rgb_display').textContent = `rgb(${{r}},${{g}},${{b}})`;
-                        
-                        // Update hex display
-                        const hex = '#' + [r, g, b].map(x => {{
-                            const hex = x.toString(16).padStart(2, '0');
-                            return hex;
-                        }}).join('');
-                        document.getElementById('hex_display').textContent = hex;
-                    }}
-                    
-                    // Hex editing functionality
-                    const hexDisplay = document.getElementById('hex_display');
-                    const hexInput = document.getElementById('hex_input');
-                    
-                    hexDisplay.addEventListener('click', function() {{
-                        hexInput.value = hexDisplay.textContent;
-                        hexDisplay.style.display = 'none';
-                        hexInput.style.display = 'inline';
-                        hexInput.focus();
-                        hexInput.select();
-                    }});
-                    
-                    hexInput.addEventListener('blur', function() {{
-                        applyHexInput();
-                    }});
-                    
-                    hexInput.addEventListener('keydown', function(e) {{
-                        if (e.key === 'Enter') {{
-                            applyHexInput();
-                        }} else if (e.key === 'Escape') {{
-                            hexInput.style.display = 'none';
-                            hexDisplay.style.display = 'inline';
-                        }}
-                    }});
-                    
-                    function applyHexInput() {{
-                        const hexValue = hexInput.value.trim();
-                        const hexRegex = /^#?([0-9A-Fa-f]{{6}})$/;
-                        const match = hexValue.match(hexRegex);
-                        
-                        if (match) {{
-                            const hex = match[1];
-                            const r = parseInt(hex.substring(0, 2), 16);
-                            const g = parseInt(hex.substring(2, 4), 16);
-                            const b = parseInt(hex.substring(4, 6), 16);
-                            
-                            // Update all controls
-                            document.getElementById("r").value = r;
-                            document.getElementById("r_val").value = r;
-                            document.getElementById("g").value = g;
-                            document.getElementById("g_val").value = g;
-                            document.getElementById("b").value = b;
-                            document.getElementById("b_val").value = b;
-                            
-                            sendUpdate(r, g, b);
-                        }}
-                        
-                        hexInput.style.display = 'none';
-                        hexDisplay.style.display = 'inline';
-                    }}
-                    
-                    function sendUpdate(r, g, b) {{
-                        fetch(`/update?r=${{r}}&g=${{g}}&b=${{b}}`);
-                        updateColorPreview(r, g, b);
-                        
-                        // Update color picker
-                        const hex = '#' + [r, g, b].map(x => x.toString(16).padStart(2, '0')).join('');
-                        document.getElementById('color_picker').value = hex;
-                    }}
-                    
-                    // Color picker functionality
-                    document.getElementById('color_picker').addEventListener('input', function(e) {{
-                        const hex = e.target.value;
-                        const r = parseInt(hex.substring(1, 3), 16);
-                        const g = parseInt(hex.substring(3, 5), 16);
-                        const b = parseInt(hex.substring(5, 7), 16);
-                        
-                        // Update all controls
-                        document.getElementById("r").value = r;
-                        document.getElementById("r_val").value = r;
-                        document.getElementById("g").value = g;
-                        document.getElementById("g_val").value = g;
-                        document.getElementById("b").value = b;
-                        document.getElementById("b_val").value = b;
-                        
-                        sendUpdate(r, g, b);
-                    }});
-
-                    function updateFromRGB() {{
-                        let r = parseInt(document.getElementById("r").value);
-                        let g = parseInt(document.getElementById("g").value);
-                        let b = parseInt(document.getElementById("b").value);
-                        
-                        // Sync slider and input
-                        document.getElementById("r_val").value = r;
-                        document.getElementById("g_val").value = g;
-                        document.getElementById("b_val").value = b;
-                        
-                        sendUpdate(r, g, b);
-                    }}
-                    
-                    function updateFromRGBInput() {{
-                        let r = Math.max(0, Math.min(255, parseInt(document.getElementById("r_val").value) || 0));
-                        let g = Math.max(0, Math.min(255, parseInt(document.getElementById("g_val").value) || 0));
-                        let b = Math.max(0, Math.min(255, parseInt(document.getElementById("b_val").value) || 0));
-                        
-                        // Sync slider and input
-                        document.getElementById("r").value = r;
-                        document.getElementById("r_val").value = r;
-                        document.getElementById("g").value = g;
-                        document.getElementById("g_val").value = g;
-                        document.getElementById("b").value = b;
-                        document.getElementById("b_val").value = b;
-                        
-                        sendUpdate(r, g, b);
-                    }}
-
-                    function updateFromWhite() {{
-                        let w = parseInt(document.getElementById("w").value);
-                        document.getElementById("w_val").value = w;
-                        
-                        // Set RGB sliders and inputs to match white
-                        ['r', 'g', 'b'].forEach(id => {{
-                            document.getElementById(id).value = w;
-                            document.getElementById(id + "_val").value = w;
-                        }});
-                        
-                        sendUpdate(w, w, w);
-                    }}
-                    
-                    function updateFromWhiteInput() {{
-                        let w = Math.max(0, Math.min(255, parseInt(document.getElementById("w_val").value) || 0));
-                        document.getElementById("w").value = w;
-                        document.getElementById("w_val").value = w;
-                        
-                        // Set RGB sliders and inputs to match white
-                        ['r', 'g', 'b'].forEach(id => {{
-                            document.getElementById(id).value = w;
-                            document.getElementById(id + "_val").value = w;
-                        }});
-                        
-                        sendUpdate(w, w, w);
-                    }}
-
-                    // Attach event listeners for sliders
-                    document.getElementById("w").addEventListener("input", updateFromWhite);
-                    document.getElementById("r").addEventListener("input", updateFromRGB);
-                    document.getElementById("g").addEventListener("input", updateFromRGB);
-                    document.getElementById("b").addEventListener("input", updateFromRGB);
-                    
-                    // Attach event listeners for number inputs
-                    document.getElementById("w_val").addEventListener("input", updateFromWhiteInput);
-                    document.getElementById("r_val").addEventListener("input", updateFromRGBInput);
-                    document.getElementById("g_val").addEventListener("input", updateFromRGBInput);
-                    document.getElementById("b_val").addEventListener("input", updateFromRGBInput);
-                    
-                    // Initialize color preview
-                    updateColorPreview({led_state['r']}, {led_state['g']}, {led_state['b']});
-                </script>
-            </body>
-            </html>
-        """, "utf-8"))
+class LEDServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server (one daemon thread per connection)."""
+    
+    # The default listen backlog of 5 can refuse connections when a page
+    # load and a burst of slider requests arrive together
+    request_queue_size = 64
 
 def start_server():
     """Start the HTTP server to serve the LED control interface."""
     handler = LEDRequestHandler
-    with socketserver.TCPServer(("", PORT), handler) as httpd:
+    with LEDServer(("", PORT), handler) as httpd:
         httpd.serve_forever()
 
+@functools.lru_cache(maxsize=1)
 def get_local_ip():
-    """Get the local IP address of the device."""
+    """
+    Get the local IP address of the device.
+    
+    The lookup needs a socket and ioctl calls, and the address doesn't
+    change while the server runs, so the result is cached.
+    """
+    import socket
+    
     try:
-        # Try to get wlan0 IP address on Linux
-        import socket
+        # Try to get the wlan0, then eth0 IP address on Linux
         import fcntl
         import struct
         
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            # Try wlan0 first
-            ip = socket.inet_ntoa(fcntl.ioctl(
-                s.fileno(),
-                0x8915,  # SIOCGIFADDR
-                struct.pack('256s', b'wlan0'[:15])
-            )[20:24])
-            return ip
-        except:
-            # Fall back to eth0 or other interfaces
-            try:
-                ip = socket.inet_ntoa(fcntl.ioctl(
-                    s.fileno(),
-                    0x8915,
-                    struct.pack('256s', b'eth0'[:15])
-                )[20:24])
-                return ip
-            except:
-                pass
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            for interface in (b'wlan0', b'eth0'):
+                try:
+                    return socket.inet_ntoa(fcntl.ioctl(
+                        s.fileno(),
+                        0x8915,  # SIOCGIFADDR
+                        struct.pack('256s', interface[:15])
+                    )[20:24])
+                except:
+                    pass
     except:
         pass
     
-    # Fallback method
+    # Fallback method: a UDP connect() picks the outgoing interface without
+    # sending any packets
     try:
-        import socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
     except:
         return "localhost"
 
 if __name__ == "__main__":
     try:
+        # Start the log writer before anything can queue messages
+        log_thread = threading.Thread(target=log_writer_loop, daemon=True)
+        log_thread.start()
+
         # Run ring animation once at startup to indicate readiness
         print(f"  Running startup animation...")
         run_ring_animation(spi, NUM_LEDS, DEFAULT_BRIGHTNESS, delay=RING_SPEED)
 
         # Initialize LEDs to current state
-        update_leds(led_state['r'], led_state['g'], led_state['b'])
+        update_leds(*led_state)
         print(f"✓ Initialized {NUM_LEDS} LEDs")
 
+        # Start the LED writer that applies /update requests
+        writer_thread = threading.Thread(target=led_writer_loop, daemon=True)
+        writer_thread.start()
+
         # Start the web server in a daemon thread (exits when main thread exits)
         server_thread = threading.Thread(target=start_server, daemon=True)
         server_thread.start()